@@ -6,22 +6,25 @@ NOW WITH PARALLEL DOWNLOADS! 🚀
 """
 
 import asyncio
+import itertools
 import json
 import os
 import sys
 import re
+import sqlite3
 import time
 from datetime import datetime
 from pathlib import Path
 import argparse
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Optional
-from urllib.parse import urlparse, parse_qs
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from telethon import TelegramClient
-    from telethon.tl.types import Message
+    from telethon.tl.types import Message, Channel
     from telethon.errors import SessionPasswordNeededError
 except ImportError:
     print("Error: telethon not installed. Run: pip install telethon")
@@ -46,6 +49,43 @@ except ImportError:
     print("Run: pip install tqdm")
     tqdm = None
 
+try:
+    import aiohttp
+    import aiofiles
+except ImportError:
+    aiohttp = None  # Drive files are downloaded with gdown in a worker thread instead
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None  # Link extraction uses the compiled regexes instead
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional speedup; stdlib json is used instead
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes, using orjson when available"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data: bytes):
+    """Parse JSON bytes, using orjson when available"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def run_in_pool(func, *args):
+    """Run a blocking call in the loop's default executor.
+    
+    Like asyncio.to_thread, but without copying the contextvars context on
+    every call; nothing offloaded here reads context variables.
+    """
+    return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
 
 class Config:
     """Configuration manager"""
@@ -56,7 +96,10 @@ class Config:
     
     def load_config(self) -> dict:
         """Load configuration from JSON file"""
-        if not os.path.exists(self.config_path):
+        try:
+            with open(self.config_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
             print(f"Error: {self.config_path} not found!")
             print("Create a config.json with the following structure:")
             print(json.dumps({
@@ -65,9 +108,6 @@ class Config:
                 "phone": "your_phone_number"
             }, indent=2))
             sys.exit(1)
-        
-        with open(self.config_path, 'r') as f:
-            return json.load(f)
     
     @property
     def api_id(self):
@@ -82,53 +122,152 @@ class Config:
         return self.data.get('phone')
 
 
+@dataclass(slots=True)
+class LinkRecord:
+    """A link found while scanning, before it is stored"""
+    url: str
+    type: str
+    caption: str
+    date: str
+    message_id: int
+    channel: str
+    sender: str
+
+
 class LinkExtractor:
     """Extract and classify links from text"""
     
+    # Patterns without the shared scheme/host prefix; the prefix is applied
+    # once per group when the combined regex is built below.
     YOUTUBE_PATTERNS = [
-        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=[\w-]+',
-        r'(?:https?://)?(?:www\.)?youtu\.be/[\w-]+',
-        r'(?:https?://)?(?:www\.)?youtube\.com/playlist\?list=[\w-]+',
+        r'youtube\.com/watch\?v=[\w-]+',
+        r'youtu\.be/[\w-]+',
+        r'youtube\.com/playlist\?list=[\w-]+',
     ]
-    
+
     DRIVE_PATTERNS = [
-        r'(?:https?://)?drive\.google\.com/file/d/[\w-]+',
-        r'(?:https?://)?drive\.google\.com/drive/folders/[\w-]+',
-        r'(?:https?://)?drive\.google\.com/open\?id=[\w-]+',
+        r'drive\.google\.com/file/d/[\w-]+',
+        r'drive\.google\.com/drive/folders/[\w-]+',
+        r'drive\.google\.com/open\?id=[\w-]+',
     ]
-    
+
+    # Compiled once at class load: a single pass over the text finds both
+    # link types, and the named group that matched gives the type.
+    _COMBINED = re.compile(
+        r'(?:https?://)?(?:'
+        r'(?P<youtube>(?:www\.)?(?:' + '|'.join(YOUTUBE_PATTERNS) + r'))'
+        r'|(?P<drive>(?:' + '|'.join(DRIVE_PATTERNS) + r'))'
+        r')',
+        re.IGNORECASE
+    )
+    _YOUTUBE = re.compile(
+        r'(?:https?://)?(?:www\.)?(?:' + '|'.join(YOUTUBE_PATTERNS) + r')',
+        re.IGNORECASE
+    )
+    _DRIVE = re.compile(
+        r'(?:https?://)?(?:' + '|'.join(DRIVE_PATTERNS) + r')',
+        re.IGNORECASE
+    )
+
+    # With hyperscan installed, both patterns are compiled into one DFA-based
+    # database and matched in a single scan. SOM_LEFTMOST reports where each
+    # match starts; UTF8/UCP keep \w consistent with Python's re.
+    _HS_TYPES = ('youtube', 'drive')
+    _HS_DB = None
+    if hyperscan:
+        _HS_DB = hyperscan.Database()
+        _hs_flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST
+                     | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP)
+        _HS_DB.compile(
+            expressions=[_YOUTUBE.pattern.encode(), _DRIVE.pattern.encode()],
+            ids=[0, 1],
+            elements=2,
+            flags=[_hs_flags, _hs_flags]
+        )
+        del _hs_flags
+
     @staticmethod
-    def extract_links(text: str) -> List[Dict[str, str]]:
-        """Extract all supported links from text"""
-        if not text:
-            return []
+    def _extract_hyperscan(text: str) -> Optional[List[Dict[str, str]]]:
+        """Extract links with hyperscan, returning the same matches as finditer.
         
-        links = []
+        Returns None when matches overlap in a way only the regex engine can
+        resolve, so the caller falls back to it.
+        """
+        data = text.encode('utf-8')
+        # Hyperscan reports every end offset; keep the longest match per start
+        spans = {}
         
-        # Extract YouTube links
-        for pattern in LinkExtractor.YOUTUBE_PATTERNS:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                links.append({
-                    'url': match.group(0),
-                    'type': 'youtube'
-                })
+        def on_match(pattern_id, start, end, flags, context):
+            if end > spans.get(start, (0, 0))[0]:
+                spans[start] = (end, pattern_id)
         
-        # Extract Google Drive links
-        for pattern in LinkExtractor.DRIVE_PATTERNS:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                links.append({
-                    'url': match.group(0),
-                    'type': 'drive'
-                })
+        LinkExtractor._HS_DB.scan(data, match_event_handler=on_match)
+        
+        # Drop matches nested inside an earlier one, like finditer does
+        links = []
+        last_end = 0
+        for start in sorted(spans):
+            end, pattern_id = spans[start]
+            if start < last_end:
+                if end > last_end:
+                    # finditer would restart matching at last_end, but
+                    # hyperscan only reports the leftmost start for this end
+                    return None
+                continue
+            links.append({
+                'url': data[start:end].decode('utf-8'),
+                'type': LinkExtractor._HS_TYPES[pattern_id]
+            })
+            last_end = end
         
         return links
 
+    @staticmethod
+    def extract_links(text: str) -> List[Dict[str, str]]:
+        """Extract all supported links from text"""
+        if not text:
+            return []
+
+        # Fast reject: most messages contain no link at all, and a substring
+        # check is far cheaper than running the regex.
+        lowered = text.lower()
+        has_youtube = 'youtu' in lowered
+        has_drive = 'drive.google' in lowered
+
+        if not has_youtube and not has_drive:
+            return []
+
+        if LinkExtractor._HS_DB is not None:
+            links = LinkExtractor._extract_hyperscan(text)
+            if links is not None:
+                return links
+
+        # Only scan for the link types that can actually be present
+        if has_youtube and has_drive:
+            return [
+                {'url': match.group(0), 'type': match.lastgroup}
+                for match in LinkExtractor._COMBINED.finditer(text)
+            ]
+
+        if has_youtube:
+            pattern, link_type = LinkExtractor._YOUTUBE, 'youtube'
+        else:
+            pattern, link_type = LinkExtractor._DRIVE, 'drive'
+
+        return [
+            {'url': match.group(0), 'type': link_type}
+            for match in pattern.finditer(text)
+        ]
+
 
 class TelegramScanner:
     """Scan Telegram channels/groups for links"""
     
+    # Message IDs covered by each get_messages request, and how many
+    # requests may be in flight at once
+    SCAN_WINDOW = 1000
+    SCAN_CONCURRENCY = 8
+    
     def __init__(self, config: Config):
         self.config = config
         self.client = None
@@ -153,19 +292,58 @@ class TelegramScanner:
         
         print("✓ Connected to Telegram")
     
-    async def scan_channel(self, channel: str, limit: Optional[int] = None) -> List[Dict]:
-        """Scan a channel/group for links"""
+    @staticmethod
+    def _links_from_message(message, channel) -> List[LinkRecord]:
+        """Extract the links in a single message"""
+        text = message.text or message.message or ''
+        return [
+            LinkRecord(
+                url=link['url'],
+                type=link['type'],
+                caption=text[:500],  # First 500 chars
+                date=message.date.isoformat(),
+                message_id=message.id,
+                channel=channel,
+                sender=getattr(message.sender, 'username', 'unknown') if message.sender else 'unknown'
+            )
+            for link in LinkExtractor.extract_links(text)
+        ]
+    
+    async def scan_channel(self, channel: str, limit: Optional[int] = None) -> List[LinkRecord]:
+        """Scan a channel/group for links.
+        
+        For a full scan of a channel or supergroup the message ID range is
+        split into windows that are fetched concurrently. Scans with `limit`,
+        and scans of basic groups and private chats, are paged through
+        sequentially so that exactly `limit` messages are read.
+        """
         if not self.client:
             await self.connect()
         
         print(f"\nScanning channel: {channel}")
         print(f"Limit: {limit if limit else 'All messages'}")
         
+        try:
+            entity = await self.client.get_entity(channel)
+        except Exception as e:
+            print(f"Error scanning channel: {e}")
+            return []
+        
+        # Only channels and supergroups number their messages densely per
+        # chat; elsewhere IDs are shared across the account, so windows over
+        # 0..max_id would mostly be empty requests. A limit counts messages,
+        # not IDs, and deleted or service messages would leave a window short.
+        if isinstance(entity, Channel) and not limit:
+            return await self._scan_windows(entity, channel)
+        return await self._scan_sequential(entity, channel, limit)
+    
+    async def _scan_sequential(self, entity, channel, limit: Optional[int]) -> List[LinkRecord]:
+        """Page through the chat's messages one request at a time"""
         collected = []
         count = 0
         
         try:
-            async for message in self.client.iter_messages(channel, limit=limit):
+            async for message in self.client.iter_messages(entity, limit=limit):
                 if not isinstance(message, Message):
                     continue
                 
@@ -173,20 +351,7 @@ class TelegramScanner:
                 if count % 100 == 0:
                     print(f"  Scanned {count} messages, found {len(collected)} links...")
                 
-                text = message.text or message.message or ''
-                links = LinkExtractor.extract_links(text)
-                
-                if links:
-                    for link in links:
-                        collected.append({
-                            'url': link['url'],
-                            'type': link['type'],
-                            'caption': text[:500],  # First 500 chars
-                            'date': message.date.isoformat(),
-                            'message_id': message.id,
-                            'channel': channel,
-                            'sender': getattr(message.sender, 'username', 'unknown') if message.sender else 'unknown'
-                        })
+                collected.extend(self._links_from_message(message, channel))
         
         except Exception as e:
             print(f"Error scanning channel: {e}")
@@ -195,6 +360,63 @@ class TelegramScanner:
         print(f"\n✓ Scan complete: {count} messages scanned, {len(collected)} links found")
         return collected
     
+    async def _scan_windows(self, entity, channel) -> List[LinkRecord]:
+        """Fetch windows of the channel's message ID range concurrently"""
+        collected = []
+        count = 0
+        
+        try:
+            latest = await self.client.get_messages(entity, limit=1)
+        except Exception as e:
+            print(f"Error scanning channel: {e}")
+            return collected
+        
+        if not latest:
+            print("\n✓ Scan complete: channel has no messages")
+            return collected
+        
+        max_id = latest[0].id
+        windows = [
+            (lo, min(lo + self.SCAN_WINDOW, max_id))
+            for lo in range(0, max_id, self.SCAN_WINDOW)
+        ]
+        
+        # Bounds the number of in-flight requests to respect flood limits
+        sem = asyncio.Semaphore(self.SCAN_CONCURRENCY)
+        
+        async def _window(lo: int, hi: int) -> List[LinkRecord]:
+            """Fetch messages with lo < id <= hi and extract their links"""
+            nonlocal count
+            async with sem:
+                messages = await self.client.get_messages(
+                    entity, limit=None, offset_id=hi + 1, min_id=lo
+                )
+            
+            found = []
+            for message in messages:
+                if not isinstance(message, Message):
+                    continue
+                
+                count += 1
+                found.extend(self._links_from_message(message, channel))
+            
+            print(f"  Scanned {count} messages...")
+            return found
+        
+        results = await asyncio.gather(
+            *(_window(lo, hi) for lo, hi in windows), return_exceptions=True
+        )
+        
+        # Windows are oldest first; reverse to keep newest-first order
+        for (lo, hi), result in zip(reversed(windows), reversed(results)):
+            if isinstance(result, Exception):
+                print(f"Error scanning messages {lo + 1}-{hi}: {result}")
+                continue
+            collected.extend(result)
+        
+        print(f"\n✓ Scan complete: {count} messages scanned, {len(collected)} links found")
+        return collected
+    
     async def close(self):
         """Close Telegram connection"""
         if self.client:
@@ -204,10 +426,15 @@ class TelegramScanner:
 class DataManager:
     """Handles all file and directory operations for harvester data."""
 
+    _UNSAFE_ID_CHARS = re.compile(r'[^\w\.\-]')
+
     def __init__(self, data_dir='.harvester_data'):
         self.data_dir = Path(data_dir)
         self.channels_dir = self.data_dir / 'channels'
         self.channel_info_path = self.data_dir / 'channel_info.json'
+        # SQLite index of all links; the channel JSON files are only read
+        # once for migration and written by the `export` command
+        self.link_store_path = self.data_dir / 'links.db'
         
         # Create directories if they don't exist
         self.data_dir.mkdir(exist_ok=True)
@@ -217,7 +444,7 @@ class DataManager:
         """Converts a channel entity (username or ID) to a safe string for filenames."""
         channel_id = str(channel_entity).lstrip('@')
         # Sanitize for filename
-        return re.sub(r'[^\w\.\-]', '_', channel_id)
+        return self._UNSAFE_ID_CHARS.sub('_', channel_id)
 
     def get_db_path(self, channel_entity) -> str:
         """Gets the database file path for a specific channel."""
@@ -226,120 +453,91 @@ class DataManager:
 
     def save_channel_list(self, channel_list: List[Dict]):
         """Saves the list of user's channels to a file."""
-        with open(self.channel_info_path, 'w', encoding='utf-8') as f:
-            json.dump(channel_list, f, indent=2, ensure_ascii=False)
+        with open(self.channel_info_path, 'wb') as f:
+            f.write(_dumps(channel_list))
         print(f"✓ Channel list saved to {self.channel_info_path}")
 
     def load_channel_list(self) -> List[Dict]:
         """Loads the list of user's channels from a file."""
-        if not self.channel_info_path.exists():
+        try:
+            with open(self.channel_info_path, 'rb') as f:
+                return _loads(f.read())
+        except FileNotFoundError:
             return []
-        with open(self.channel_info_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
 
     def get_all_db_paths(self) -> List[str]:
         """Returns a list of all channel database file paths."""
         return [str(p) for p in self.channels_dir.glob('*.json')]
 
-    def mark_link_downloaded(self, link: Dict, success: bool):
-        """Marks a single link as downloaded in its source channel database."""
-        if 'channel' not in link:
-            return  # Cannot update if we don't know the source
+    async def load_all_links(self) -> List[Dict]:
+        """Loads every channel database concurrently and returns all their links."""
+        dbs = await asyncio.gather(*(
+            run_in_pool(LinkDatabase, db_path)
+            for db_path in self.get_all_db_paths()
+        ))
+        return list(itertools.chain.from_iterable(db.links for db in dbs))
+
+    async def open_link_store(self) -> 'LinkStore':
+        """Opens the SQLite link index, importing legacy per-channel JSON on first use."""
+        store = LinkStore(str(self.link_store_path))
+        
+        if store.is_empty() and self.get_all_db_paths():
+            links = await self.load_all_links()
+            imported = store.import_links(links)
+            print(f"✓ Imported {imported} links from channel JSON files into {self.link_store_path}")
+        
+        return store
+
+    def export_json(self, store: 'LinkStore'):
+        """Writes every channel's links from the SQLite index to its JSON file."""
+        by_channel = {}
+        for link in store.get_links():
+            by_channel.setdefault(link.get('channel'), []).append(link)
         
-        db_path = self.get_db_path(link['channel'])
-        db = LinkDatabase(db_path)
-        db.mark_downloaded(link['url'], success)
+        for channel, links in by_channel.items():
+            LinkDatabase(self.get_db_path(channel), links=links).save()
+        
+        print(f"✓ Exported {sum(map(len, by_channel.values()))} links from "
+              f"{len(by_channel)} channels to {self.channels_dir}")
 
 
 class LinkDatabase:
-    """Manage collected links database for a single file."""
+    """A single channel's links as a JSON file (legacy format, used for import/export)."""
     
-    def __init__(self, db_path: Optional[str]):
+    def __init__(self, db_path: Optional[str], links: Optional[List[Dict]] = None):
         self.db_path = db_path
-        self.links = self.load()
-        # Only create a lock if this is a file-based database
-        self.lock = threading.Lock() if db_path else None
+        # Links passed in directly are used as-is, without reading the file
+        self.links = links if links is not None else self.load()
     
     def load(self) -> List[Dict]:
         """Load links from database"""
-        if self.db_path and os.path.exists(self.db_path):
-            with open(self.db_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
+        if not self.db_path:
+            return []
+        
+        try:
+            with open(self.db_path, 'rb') as f:
+                return _loads(f.read())
+        except FileNotFoundError:
+            return []
     
     def save(self):
         """Save links to database"""
-        if not self.db_path or not self.lock:
+        if not self.db_path:
             # This is an in-memory DB, cannot be saved.
             return
 
-        with self.lock:
-            # Ensure parent directory exists
-            Path(self.db_path).parent.mkdir(exist_ok=True)
-            with open(self.db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.links, f, indent=2, ensure_ascii=False)
-    
-    def add_links(self, new_links: List[Dict]):
-        """Add new links to database (with deduplication)"""
-        existing_urls = {link['url'] for link in self.links}
-        added = 0
-        
-        for link in new_links:
-            if link['url'] not in existing_urls:
-                link['status'] = 'pending'
-                link['collected_at'] = datetime.now().isoformat()
-                self.links.append(link)
-                existing_urls.add(link['url'])
-                added += 1
-        
-        if added > 0:
-            self.save()
-
-        print(f"\n✓ Added {added} new links to channel database.")
-        print(f"  Total links for this channel: {len(self.links)}")
-    
-    def get_pending_links(self, link_type: Optional[str] = None) -> List[Dict]:
-        """Get links that haven't been downloaded or have failed."""
-        pending = [
-            link for link in self.links 
-            if link.get('status', 'pending') in ['pending', 'failed']
-        ]
-        
-        if link_type:
-            pending = [link for link in pending if link['type'] == link_type]
-        
-        return pending
-    
-    def mark_downloaded(self, url: str, success: bool = True):
-        """Mark a link as downloaded (thread-safe)"""
-        if not self.db_path or not self.lock:
-            # In-memory, just update the list
-            for link in self.links:
-                if link['url'] == url:
-                    link['status'] = 'completed' if success else 'failed'
-                    link['downloaded_at'] = datetime.now().isoformat()
-                    break
-            return
-
-        # For file-based DB, it's safer to load, update, save.
-        with self.lock:
-            # Re-load to ensure we have the latest data before writing
-            links = self.load()
-            for link in links:
-                if link['url'] == url:
-                    link['status'] = 'completed' if success else 'failed'
-                    link['downloaded_at'] = datetime.now().isoformat()
-                    break
-            
-            with open(self.db_path, 'w', encoding='utf-8') as f:
-                json.dump(links, f, indent=2, ensure_ascii=False)
+        # Ensure parent directory exists
+        Path(self.db_path).parent.mkdir(exist_ok=True)
+        with open(self.db_path, 'wb') as f:
+            f.write(_dumps(self.links))
 
     def list_links(self, filter_text: Optional[str] = None):
         """List all links with optional filter"""
         links = self.links
         
         if filter_text:
-            links = [l for l in links if filter_text.lower() in l['caption'].lower()]
+            flt = re.compile(re.escape(filter_text), re.IGNORECASE)
+            links = [l for l in links if flt.search(l['caption'])]
         
         if not links:
             print("No links found")
@@ -353,6 +551,166 @@ class LinkDatabase:
             print(f"   Date: {link['date']} | Status: {link.get('status', 'pending')}\n")
 
 
+class LinkStore:
+    """SQLite index of collected links across all channels"""
+    
+    COLUMNS = ('url', 'type', 'channel', 'status', 'caption', 'date',
+               'message_id', 'sender', 'collected_at', 'downloaded_at')
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS links (
+                    url TEXT PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    channel TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    caption TEXT NOT NULL DEFAULT '',
+                    date TEXT,
+                    message_id INTEGER,
+                    sender TEXT,
+                    collected_at TEXT,
+                    downloaded_at TEXT
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_links_status_type ON links (status, type)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_links_channel ON links (channel)')
+    
+    def close(self):
+        self.conn.close()
+    
+    @staticmethod
+    def _row_to_link(row: sqlite3.Row) -> Dict:
+        # Leave out unset columns, matching the JSON layout
+        return {key: row[key] for key in row.keys() if row[key] is not None}
+    
+    def is_empty(self) -> bool:
+        return self.conn.execute('SELECT 1 FROM links LIMIT 1').fetchone() is None
+    
+    def import_links(self, links: List[Dict]) -> int:
+        """Insert link dicts (e.g. from channel JSON files), keeping their status"""
+        rows = []
+        for link in links:
+            row = {key: link.get(key) for key in self.COLUMNS}
+            row['status'] = row['status'] or 'pending'
+            row['caption'] = row['caption'] or ''
+            if row['channel'] is not None:
+                row['channel'] = str(row['channel'])
+            rows.append(tuple(row[key] for key in self.COLUMNS))
+        
+        before = self.conn.total_changes
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO links ({', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+        return self.conn.total_changes - before
+    
+    def add_links(self, channel, new_links: List[LinkRecord]):
+        """Add links scanned from `channel` (duplicates are ignored by the primary key)"""
+        # All links in one call are collected at the same moment
+        now_iso = datetime.now().isoformat()
+        rows = [
+            (record.url, record.type, str(record.channel), record.caption,
+             record.date, record.message_id, record.sender, now_iso)
+            for record in new_links
+        ]
+        
+        # One transaction for the whole batch
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(
+                '''INSERT OR IGNORE INTO links
+                   (url, type, channel, caption, date, message_id, sender, collected_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                rows
+            )
+        added = self.conn.total_changes - before
+        
+        channel_total = self.conn.execute(
+            'SELECT COUNT(*) FROM links WHERE channel = ?', (str(channel),)
+        ).fetchone()[0]
+        
+        print(f"\n✓ Added {added} new links to the link database.")
+        print(f"  Total links for this channel: {channel_total}")
+    
+    def get_links(self) -> List[Dict]:
+        """All links in the order they were collected"""
+        rows = self.conn.execute('SELECT * FROM links ORDER BY rowid')
+        return [self._row_to_link(row) for row in rows]
+    
+    def get_pending_links(self, link_type: Optional[str] = None) -> List[Dict]:
+        """Get links that haven't been downloaded or have failed."""
+        query = "SELECT * FROM links WHERE status IN ('pending', 'failed')"
+        params = ()
+        if link_type:
+            query += ' AND type = ?'
+            params = (link_type,)
+        rows = self.conn.execute(query + ' ORDER BY rowid', params)
+        return [self._row_to_link(row) for row in rows]
+    
+    def mark_downloaded(self, results: Dict[str, tuple]):
+        """Record download results, given as {url: (success, timestamp)}"""
+        rows = [
+            ('completed' if success else 'failed', ts, url)
+            for url, (success, ts) in results.items()
+        ]
+        with self.conn:
+            self.conn.executemany(
+                'UPDATE links SET status = ?, downloaded_at = ? WHERE url = ?', rows
+            )
+    
+    def count_by(self, column: str) -> Dict[str, int]:
+        """Number of links per distinct value of `status` or `type`"""
+        if column not in ('status', 'type'):
+            raise ValueError(f"Cannot group by {column}")
+        rows = self.conn.execute(f'SELECT {column}, COUNT(*) FROM links GROUP BY {column}')
+        return {value: count for value, count in rows}
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+    
+    def __init__(self, rate_per_sec: float = 5, burst: int = 5):
+        self.rate = rate_per_sec
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.cond = threading.Condition()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        with self.cond:
+            self._refill()
+            while self.tokens < 1:
+                # Sleep roughly until the next token is due; waiting on the
+                # condition releases the lock for other workers meanwhile
+                self.cond.wait((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+    
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a token is available, then take it"""
+        while True:
+            with self.cond:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+
 class ProgressHook:
     """Custom progress hook for yt-dlp with tqdm"""
     
@@ -384,6 +742,12 @@ class ProgressHook:
 class Downloader:
     """Download content from collected links with parallel support"""
     
+    DRIVE_DOWNLOAD_URL = 'https://drive.google.com/uc'
+    
+    _DRIVE_ID = re.compile(r'/(?:file/d|folders)/([\w-]+)|[?&]id=([\w-]+)')
+    _SPECIAL_CHARS = re.compile(r'[^\w\s-]')
+    _SEPARATORS = re.compile(r'[-\s]+')
+    
     def __init__(self, output_dir='downloads', workers=4):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
@@ -394,13 +758,62 @@ class Downloader:
         self.drive_dir.mkdir(exist_ok=True)
         
         self.workers = workers
-        self.download_lock = threading.Lock()  # Rate limiting
+        # Rate limiting: one bucket per host, so YouTube and Drive downloads
+        # don't hold each other back
+        self.buckets = {
+            'youtube': TokenBucket(),  # youtube.com / youtu.be
+            'drive': TokenBucket(),    # drive.google.com
+        }
+        
+        # yt-dlp options shared by every YoutubeDL instance; the output
+        # template is set per download
+        self.ydl_opts = {
+            'format': 'best[height<=1080]',
+            'quiet': True,  # Suppress yt-dlp output
+            'no_warnings': True,
+            'progress_hooks': [self._progress_hook],
+        }
+        # One YoutubeDL per worker thread, reused across downloads so
+        # extractor setup happens once per thread rather than once per URL
+        self._tls = threading.local()
+        self._ydls = []
+        self._ydls_lock = threading.Lock()
     
-    def sanitize_filename(self, text: str, max_length: int = 100) -> str:
-        """Create a safe filename from text"""
+    def _ydl(self):
+        """Return this thread's YoutubeDL instance, creating it on first use"""
+        ydl = getattr(self._tls, 'ydl', None)
+        if ydl is None:
+            # yt-dlp keeps the options dict by reference and sets the output
+            # template inside it, so each thread needs its own copy
+            ydl = self._tls.ydl = yt_dlp.YoutubeDL({**self.ydl_opts, 'outtmpl': {}})
+            with self._ydls_lock:
+                self._ydls.append(ydl)
+        return ydl
+    
+    def _progress_hook(self, d):
+        # Hooks run in the downloading thread, so forward to that thread's bar
+        hook = getattr(self._tls, 'hook', None)
+        if hook:
+            hook(d)
+    
+    def close(self):
+        """Close all YoutubeDL instances created by worker threads"""
+        with self._ydls_lock:
+            ydls, self._ydls = self._ydls, []
+        for ydl in ydls:
+            ydl.close()
+    
+    def __del__(self):
+        if hasattr(self, '_ydls'):
+            self.close()
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def sanitize_filename(text: str, max_length: int = 100) -> str:
+        """Create a safe filename from text (memoized; captions repeat often)"""
         # Remove special characters
-        safe = re.sub(r'[^\w\s-]', '', text)
-        safe = re.sub(r'[-\s]+', '_', safe)
+        safe = Downloader._SPECIAL_CHARS.sub('', text)
+        safe = Downloader._SEPARATORS.sub('_', safe)
         return safe[:max_length]
     
     def download_youtube(self, url: str, caption: str, pbar: Optional[tqdm] = None) -> tuple[bool, str]:
@@ -408,19 +821,15 @@ class Downloader:
         try:
             safe_name = self.sanitize_filename(caption) if caption else 'video'
             
-            # Custom progress hook
-            progress_hook = ProgressHook(pbar) if pbar else None
-            
-            ydl_opts = {
-                'format': 'best[height<=1080]',
-                'outtmpl': str(self.youtube_dir / f'{safe_name}_%(id)s.%(ext)s'),
-                'quiet': True,  # Suppress yt-dlp output
-                'no_warnings': True,
-                'progress_hooks': [progress_hook] if progress_hook else [],
-            }
+            ydl = self._ydl()
+            ydl.params['outtmpl']['default'] = str(self.youtube_dir / f'{safe_name}_%(id)s.%(ext)s')
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            # Custom progress hook
+            self._tls.hook = ProgressHook(pbar) if pbar else None
+            try:
                 ydl.download([url])
+            finally:
+                self._tls.hook = None
             
             return True, "Success"
         
@@ -431,18 +840,17 @@ class Downloader:
                 error_msg = error_msg[:100] + "..."
             return False, error_msg
     
+    def extract_drive_id(self, url: str) -> Optional[str]:
+        """Extract the file or folder ID from various Drive URL formats"""
+        match = self._DRIVE_ID.search(url)
+        if not match:
+            return None
+        return match.group(1) or match.group(2)
+    
     def download_drive(self, url: str, caption: str, pbar: Optional[tqdm] = None) -> tuple[bool, str]:
         """Download Google Drive file"""
         try:
-            # Extract file ID from various Drive URL formats
-            file_id = None
-            
-            if '/file/d/' in url:
-                file_id = url.split('/file/d/')[1].split('/')[0]
-            elif '/folders/' in url:
-                file_id = url.split('/folders/')[1].split('/')[0]
-            elif 'id=' in url:
-                file_id = parse_qs(urlparse(url).query).get('id', [None])[0]
+            file_id = self.extract_drive_id(url)
             
             if not file_id:
                 return False, "Could not extract file ID"
@@ -464,12 +872,93 @@ class Downloader:
                 error_msg = error_msg[:100] + "..."
             return False, error_msg
     
+    async def _adrive(self, session, file_id: str, out_path: str,
+                      pbar: Optional[tqdm] = None) -> tuple[bool, str]:
+        """Stream a Google Drive file to disk without tying up a thread"""
+        # Stream into a temporary file so a failed or interrupted download
+        # never leaves a truncated file under the final name
+        part_path = out_path + '.part'
+        done = False
+        try:
+            params = {'id': file_id, 'export': 'download', 'confirm': 't'}
+            async with session.get(self.DRIVE_DOWNLOAD_URL, params=params) as resp:
+                if resp.status != 200:
+                    return False, f"HTTP {resp.status}"
+                if resp.content_type == 'text/html':
+                    # Drive serves an HTML page instead of the file when access is denied
+                    return False, "Drive returned a web page instead of the file (no access?)"
+                
+                if pbar and resp.content_length:
+                    pbar.reset(total=resp.content_length)
+                
+                async with aiofiles.open(part_path, 'wb') as f:
+                    async for chunk in resp.content.iter_chunked(1 << 16):
+                        await f.write(chunk)
+                        if pbar:
+                            pbar.update(len(chunk))
+            
+            os.replace(part_path, out_path)
+            done = True
+            return True, "Success"
+        
+        except Exception as e:
+            error_msg = str(e) or type(e).__name__
+            if len(error_msg) > 100:
+                error_msg = error_msg[:100] + "..."
+            return False, error_msg
+        
+        finally:
+            if not done:
+                try:
+                    os.remove(part_path)
+                except FileNotFoundError:
+                    pass
+    
+    async def download_drive_async(self, session, link: Dict, position: int = 0,
+                                   total: int = 0) -> tuple[Dict, bool, str]:
+        """Download a single Drive file link with progress tracking"""
+        url = link['url']
+        caption = link.get('caption', '')
+        
+        file_id = self.extract_drive_id(url)
+        if not file_id:
+            return link, False, "Could not extract file ID"
+        
+        safe_name = self.sanitize_filename(caption) if caption else f'drive_{file_id}'
+        output_path = str(self.drive_dir / safe_name)
+        
+        await self.buckets['drive'].acquire_async()
+        
+        desc = f"[{position}/{total}] DRIVE"
+        
+        if tqdm:
+            with tqdm(total=100, desc=desc, position=position, leave=False,
+                     bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt}', dynamic_ncols=True) as pbar:
+                success, msg = await self._adrive(session, file_id, output_path, pbar)
+                
+                # Complete the progress bar
+                if success:
+                    pbar.n = pbar.total
+                    pbar.set_description(f"✓ {desc}")
+                else:
+                    pbar.set_description(f"✗ {desc} - {msg[:30]}")
+                pbar.refresh()
+        else:
+            success, msg = await self._adrive(session, file_id, output_path)
+        
+        return link, success, msg
+    
     def download_single_link(self, link: Dict, position: int = 0, total: int = 0) -> tuple[Dict, bool, str]:
         """Download a single link with progress tracking"""
         url = link['url']
         link_type = link['type']
         caption = link.get('caption', '')
         
+        # Wait for this host's rate limiter before starting the download
+        bucket = self.buckets.get(link_type)
+        if bucket:
+            bucket.acquire()
+        
         # Create a progress bar for this specific download if tqdm is available
         desc = f"[{position}/{total}] {link_type.upper()}"
         
@@ -477,10 +966,6 @@ class Downloader:
             with tqdm(total=100, desc=desc, position=position, leave=False, 
                      bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt}', dynamic_ncols=True) as pbar:
                 
-                # Small delay to prevent rate limiting
-                with self.download_lock:
-                    time.sleep(0.1)  # 100ms delay between starting downloads
-                
                 if link_type == 'youtube':
                     success, msg = self.download_youtube(url, caption, pbar)
                 elif link_type == 'drive':
@@ -497,9 +982,6 @@ class Downloader:
                 pbar.refresh()
         else:
             # Fallback without tqdm
-            with self.download_lock:
-                time.sleep(0.1)
-            
             if link_type == 'youtube':
                 success, msg = self.download_youtube(url, caption)
             elif link_type == 'drive':
@@ -509,7 +991,7 @@ class Downloader:
         
         return link, success, msg
     
-    def download_batch(self, links: List[Dict], data_manager: DataManager):
+    async def download_batch(self, links: List[Dict], store: LinkStore):
         """Download multiple links in parallel"""
         total = len(links)
         
@@ -529,46 +1011,77 @@ class Downloader:
         
         start_time = time.time()
         
-        # Use ThreadPoolExecutor for parallel downloads
-        with ThreadPoolExecutor(max_workers=self.workers) as executor:
-            # Submit all download tasks
-            future_to_link = {
-                executor.submit(self.download_single_link, link, i+1, total): link 
-                for i, link in enumerate(links)
-            }
+        # Create main progress bar if tqdm available
+        if tqdm:
+            main_pbar = tqdm(total=total, desc="Overall Progress", position=self.workers+1,
+                           bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]')
+        
+        # The semaphore caps concurrent downloads at `workers`; each blocking
+        # yt-dlp/gdown call runs in a worker thread via run_in_pool.
+        sem = asyncio.Semaphore(self.workers)
+        # Status updates are collected here and written in one transaction
+        # at the end, as {url: (success, timestamp)}
+        download_results = {}
+        
+        # Drive files are plain HTTPS downloads, so with aiohttp available
+        # they are streamed on the event loop over one shared session.
+        # YouTube links and Drive folders still go through yt-dlp/gdown.
+        # No overall timeout: large files can take far longer than aiohttp's
+        # 5-minute default; only stalled connections are treated as failures
+        session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+        ) if aiohttp else None
+        
+        async def _one(link: Dict, position: int):
+            async with sem:
+                try:
+                    if session and link['type'] == 'drive' and '/folders/' not in link['url']:
+                        link, success, msg = await self.download_drive_async(
+                            session, link, position, total
+                        )
+                    else:
+                        link, success, msg = await run_in_pool(
+                            self.download_single_link, link, position, total
+                        )
+                except Exception as e:
+                    # One bad link must not abort the rest of the batch
+                    success, msg = False, str(e)[:100] or type(e).__name__
             
-            # Create main progress bar if tqdm available
-            if tqdm:
-                main_pbar = tqdm(total=total, desc="Overall Progress", position=self.workers+1,
-                               bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]')
+            # Record result for the end-of-batch database update
+            download_results[link['url']] = (success, datetime.now().isoformat())
             
-            # Process completed downloads
-            for future in as_completed(future_to_link):
-                link, success, msg = future.result()
-                
-                # Update database
-                data_manager.mark_link_downloaded(link, success)
-                
-                # Update statistics
-                if success:
-                    results['success'] += 1
-                else:
-                    results['failed'] += 1
-                    results['errors'].append({
-                        'url': link['url'],
-                        'error': msg
-                    })
-                
-                # Update main progress bar
-                if tqdm:
-                    main_pbar.update(1)
-                    main_pbar.set_postfix({
-                        'Success': results['success'],
-                        'Failed': results['failed']
-                    })
+            # Update statistics
+            if success:
+                results['success'] += 1
+            else:
+                results['failed'] += 1
+                results['errors'].append({
+                    'url': link['url'],
+                    'error': msg
+                })
+            
+            # Update main progress bar
+            if tqdm:
+                main_pbar.update(1)
+                main_pbar.set_postfix({
+                    'Success': results['success'],
+                    'Failed': results['failed']
+                })
+        
+        try:
+            await asyncio.gather(
+                *(_one(link, i+1) for i, link in enumerate(links)), return_exceptions=True
+            )
+        finally:
+            if session:
+                await session.close()
             
             if tqdm:
                 main_pbar.close()
+            
+            # Update database, even if the batch was interrupted, so finished
+            # downloads aren't repeated on the next run
+            store.mark_downloaded(download_results)
         
         # Calculate statistics
         elapsed = time.time() - start_time
@@ -608,6 +1121,7 @@ Examples:
   python main.py list --filter "tutorial"
   python main.py download --all --workers 5
   python main.py download --type youtube --workers 3
+  python main.py export
         """
     )
     
@@ -636,12 +1150,24 @@ Examples:
     # List channels command
     subparsers.add_parser('list-channels', help='List all your channels/groups with IDs')
     
+    # Export command
+    subparsers.add_parser('export', help='Export collected links to per-channel JSON files')
+    
     args = parser.parse_args()
     
     if not args.command:
         parser.print_help()
         return
     
+    # All blocking work (downloads, JSON loads) runs on the default executor.
+    # Python sizes it to min(32, cpu_count + 4) threads, far more than the
+    # handful of concurrent downloads we allow, and each idle thread still
+    # reserves a stack (~8 MB of address space on Linux). Size it to match.
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(
+        max_workers=max(1, getattr(args, 'workers', 4)),
+        thread_name_prefix='harvest'
+    ))
+    
     # Initialize data manager
     data_manager = DataManager()
     
@@ -659,21 +1185,20 @@ Examples:
 
         try:
             links = await scanner.scan_channel(channel_entity, args.limit)
-            db_path = data_manager.get_db_path(channel_entity)
-            db = LinkDatabase(db_path)
-            db.add_links(links)
+            store = await data_manager.open_link_store()
+            try:
+                store.add_links(channel_entity, links)
+            finally:
+                store.close()
         finally:
             await scanner.close()
     
     elif args.command == 'list':
-        all_links = []
-        for db_path in data_manager.get_all_db_paths():
-            db = LinkDatabase(db_path)
-            all_links.extend(db.links)
-        
-        agg_db = LinkDatabase(None)
-        agg_db.links = all_links
-        agg_db.list_links(args.filter)
+        store = await data_manager.open_link_store()
+        try:
+            LinkDatabase(None, links=store.get_links()).list_links(args.filter)
+        finally:
+            store.close()
     
     elif args.command == 'download':
         # Validate worker count
@@ -688,44 +1213,41 @@ Examples:
             if response.lower() != 'y':
                 return
         
-        downloader = Downloader(workers=workers)
-        
-        # Aggregate links from all databases
-        all_links = []
-        for db_path in data_manager.get_all_db_paths():
-            db = LinkDatabase(db_path)
-            all_links.extend(db.links)
-        
-        agg_db = LinkDatabase(None)
-        agg_db.links = all_links
-
-        if args.all:
-            pending = agg_db.get_pending_links(args.type)
-        elif args.filter:
-            all_pending = agg_db.get_pending_links(args.type)
-            pending = [l for l in all_pending if args.filter.lower() in l['caption'].lower()]
-        else:
+        if not args.all and not args.filter:
             print("Error: Specify --all or --filter")
             return
         
-        if not pending:
-            print("No pending links to download")
-            return
+        downloader = Downloader(workers=workers)
+        store = await data_manager.open_link_store()
         
-        downloader.download_batch(pending, data_manager)
+        try:
+            pending = store.get_pending_links(args.type)
+            if not args.all:
+                flt = re.compile(re.escape(args.filter), re.IGNORECASE)
+                pending = [l for l in pending if flt.search(l['caption'])]
+            
+            if not pending:
+                print("No pending links to download")
+                return
+            
+            await downloader.download_batch(pending, store)
+        finally:
+            store.close()
     
     elif args.command == 'status':
-        all_links = []
-        for db_path in data_manager.get_all_db_paths():
-            db = LinkDatabase(db_path)
-            all_links.extend(db.links)
+        store = await data_manager.open_link_store()
+        try:
+            by_status = store.count_by('status')
+            by_type = store.count_by('type')
+        finally:
+            store.close()
 
-        total = len(all_links)
-        pending = len([l for l in all_links if l.get('status', 'pending') in ['pending', 'failed']])
-        completed = len([l for l in all_links if l.get('status') == 'completed'])
+        total = sum(by_status.values())
+        pending = by_status.get('pending', 0) + by_status.get('failed', 0)
+        completed = by_status.get('completed', 0)
         
-        youtube = len([l for l in all_links if l['type'] == 'youtube'])
-        drive = len([l for l in all_links if l['type'] == 'drive'])
+        youtube = by_type.get('youtube', 0)
+        drive = by_type.get('drive', 0)
         
         print("\n" + "="*50)
         print("TELEGRAM LINK HARVESTER - STATUS")
@@ -776,6 +1298,13 @@ Examples:
         
         finally:
             await scanner.close()
+    
+    elif args.command == 'export':
+        store = await data_manager.open_link_store()
+        try:
+            data_manager.export_json(store)
+        finally:
+            store.close()
 
 
 if __name__ == '__main__':